@@ -21,6 +21,9 @@ setup(
     long_description=read('README.md'),
     long_description_content_type='text/markdown',
     install_requires=['requests'],
+    extras_require={
+        'orjson': ['orjson'],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -1,17 +1,23 @@
 import os
+import shutil
+import subprocess
+import sys
 import tempfile
 import pytest
 import unittest
+from unittest import mock
 from datetime import datetime
 
 import youversion
 
-from requests import HTTPError
+from requests import HTTPError, Response
 
 YOUVERSION_API_TOKEN = os.getenv('YOUVERSION_API_TOKEN', None)
 if not YOUVERSION_API_TOKEN:
     raise ValueError('YOUVERSION_API_TOKEN')
 
+DEFAULT_CACHE_DIR = youversion.API.CACHE_DIR
+
 
 def test_day_of_year():
     dt = datetime.fromtimestamp(1568416679.74593)
@@ -29,17 +35,63 @@ def test_day_of_the_year_from_iso_date():
         raise AssertionError()
 
 
+def test_day_of_the_year_from_iso_date_only():
+    if not youversion.day_of_the_year_from_iso_date('2019-09-13') == 256:
+        raise AssertionError()
+
+
+def test_day_of_the_year_from_invalid_iso_date():
+    with pytest.raises(ValueError):
+        youversion.day_of_the_year_from_iso_date('2019-02-30')
+
+
+def test_day_of_the_year_from_non_ascii_iso_date():
+    with pytest.raises(ValueError):
+        youversion.day_of_the_year_from_iso_date('\uff12\uff10\uff11\uff19-\uff10\uff19-\uff11\uff13')
+
+
 def test_current_day_of_year():
     current_day = datetime.now().timetuple().tm_yday
     if not youversion.current_day_of_year() == current_day:
         raise AssertionError()
 
 
+def _run_isolated(code: str) -> str:
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.check_output([sys.executable, '-c', code], cwd=project_dir, text=True).strip()
+
+
+def test_import_does_not_load_requests():
+    code = 'import sys, youversion; youversion.Language.English; print("requests" in sys.modules)'
+    if not _run_isolated(code) == 'False':
+        raise AssertionError()
+
+
+def test_submodule_available_after_import():
+    code = 'import youversion; print(youversion.youversion.API.__name__)'
+    if not _run_isolated(code) == 'API':
+        raise AssertionError()
+
+
+def _response(status_code: int, content: bytes = b'', headers: dict = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
 class ImageTest(unittest.TestCase):
 
     def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+        youversion.API.CACHE_DIR = self.cache_dir
         self.client = youversion.API(YOUVERSION_API_TOKEN)
 
+    def tearDown(self) -> None:
+        youversion.API.CACHE_DIR = DEFAULT_CACHE_DIR
+        shutil.rmtree(self.cache_dir)
+
     def test_image_valid_url(self):
         votd = self.client.get_verse_of_the_day()
         url = votd.image.url(width=1, height=1)
@@ -57,6 +109,11 @@ class ImageTest(unittest.TestCase):
         with pytest.raises(youversion.InvalidImageSize):
             votd.image.url(width=1, height=youversion.Image.MAX_SIZE + 1)
 
+    def test_image_zero_size_url(self):
+        votd = self.client.get_verse_of_the_day()
+        with pytest.raises(youversion.InvalidImageSize):
+            votd.image.url(width=0, height=1)
+
     def test_image_valid_square_url(self):
         votd = self.client.get_verse_of_the_day()
         url = votd.image.square_url(size=1)
@@ -100,12 +157,34 @@ class ImageTest(unittest.TestCase):
             if os.path.exists(save_path):
                 os.remove(save_path)
 
+    def test_download_all(self):
+        save_dir = tempfile.mkdtemp()
+        votds = self.client.get_verses_of_the_day([1, 2, 1])
+
+        try:
+            paths = youversion.download_all(votds, width=1, height=1, save_dir=save_dir)
+            if not len(paths) == 3 or not len(set(paths)) == 2:
+                raise AssertionError()
+            if not paths[0] == paths[2]:
+                raise AssertionError()
+            for actual_save_path in paths:
+                if not os.path.dirname(actual_save_path) == save_dir or not os.path.exists(actual_save_path):
+                    raise AssertionError()
+        finally:
+            shutil.rmtree(save_dir)
+
 
 class APITest(unittest.TestCase):
 
     def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+        youversion.API.CACHE_DIR = self.cache_dir
         self.client = youversion.API(YOUVERSION_API_TOKEN)
 
+    def tearDown(self) -> None:
+        youversion.API.CACHE_DIR = DEFAULT_CACHE_DIR
+        shutil.rmtree(self.cache_dir)
+
     def test_default_language(self):
         if not self.client.language == youversion.Language.English:
             raise AssertionError()
@@ -129,6 +208,10 @@ class APITest(unittest.TestCase):
         with pytest.raises(youversion.UnsupportedLanguage):
             self.client.language = 'BAD_LANG'
 
+    def test_set_language_class_attribute_invalid(self):
+        with pytest.raises(youversion.UnsupportedLanguage):
+            self.client.language = '__module__'
+
     def test_header_accepts_json(self):
         header = self.client._header
         if 'accept' not in header:
@@ -154,6 +237,62 @@ class APITest(unittest.TestCase):
         with pytest.raises(HTTPError):
             self.client._get('not_a_valid_resource')
 
+    def test__get_conditional_request(self):
+        responses = [
+            _response(200, b'{"data": [1]}', {'ETag': '"v1"'}),
+            _response(304),
+        ]
+        with mock.patch.object(self.client._session, 'get', side_effect=responses) as get:
+            first = self.client._get('versions')
+            second = self.client._get('versions')
+
+        if not first == second == {'data': [1]}:
+            raise AssertionError()
+        if 'if-none-match' in get.call_args_list[0][1]['headers']:
+            raise AssertionError()
+        if not get.call_args_list[1][1]['headers']['If-None-Match'] == '"v1"':
+            raise AssertionError()
+
+    def test__get_conditional_request_params(self):
+        responses = [
+            _response(200, b'{"data": [1]}', {'ETag': '"v1"'}),
+            _response(304),
+            _response(200, b'{"data": [2]}', {'ETag': '"v2"'}),
+            _response(200, b'{"data": [3]}', {'ETag': '"v3"'}),
+        ]
+        with mock.patch.object(self.client._session, 'get', side_effect=responses) as get:
+            self.client._get('verse_of_the_day', params={'ids': [1, 2]})
+            self.client._get('verse_of_the_day', params=[('ids', 1), ('ids', 2)])
+            self.client._get('verse_of_the_day', params=None)
+            self.client._get('verse_of_the_day/1', params={'version_id': 1})
+
+        if not get.call_args_list[1][1]['headers']['If-None-Match'] == '"v1"':
+            raise AssertionError()
+        if 'if-none-match' in get.call_args_list[2][1]['headers']:
+            raise AssertionError()
+        if not len(self.client._validator_cache) == 2:
+            # Per day responses are not revalidated
+            raise AssertionError()
+
+    def test__get_conditional_request_cache_size(self):
+        responses = [
+            _response(200, b'{}', {'ETag': f'"v{version_id}"'})
+            for version_id in range(youversion.API.VALIDATOR_CACHE_SIZE + 1)
+        ]
+        with mock.patch.object(self.client._session, 'get', side_effect=responses):
+            for version_id in range(youversion.API.VALIDATOR_CACHE_SIZE + 1):
+                self.client._get('verse_of_the_day', params={'version_id': version_id})
+
+        if not len(self.client._validator_cache) == youversion.API.VALIDATOR_CACHE_SIZE:
+            raise AssertionError()
+
+    def test__get_merges_headers(self):
+        with mock.patch.object(self.client._session, 'get', return_value=_response(200, b'{}')) as get:
+            self.client._get('versions', headers={'x-test': '1'})
+
+        if not get.call_args[1]['headers']['x-test'] == '1':
+            raise AssertionError()
+
     def test_default_bible_version(self):
         bible_version = self.client.bible_version
         if bible_version.id is None:
@@ -191,6 +330,24 @@ class APITest(unittest.TestCase):
         if 'KJV' not in self.client.bible_versions:
             raise AssertionError()
 
+    def test_bible_versions_disk_cache(self):
+        youversion.youversion._VERSIONS_CACHE.clear()
+        if 'KJV' not in self.client.bible_versions:
+            raise AssertionError()
+        if not os.path.exists(os.path.join(self.cache_dir, 'versions-en.json')):
+            raise AssertionError()
+
+        youversion.youversion._VERSIONS_CACHE.clear()
+        client = youversion.API(YOUVERSION_API_TOKEN)
+        with mock.patch.object(client, '_get', side_effect=AssertionError()):
+            if 'KJV' not in client.bible_versions:
+                raise AssertionError()
+
+    def test_bible_versions_memory_cache_expires(self):
+        youversion.youversion._VERSIONS_CACHE[youversion.Language.English] = (0, {})
+        if 'KJV' not in self.client.bible_versions:
+            raise AssertionError()
+
     def test_get_valid_bible_version(self):
         if self.client.get_bible_version('ASV') is None:
             raise AssertionError()
@@ -214,6 +371,10 @@ class APITest(unittest.TestCase):
         if not self.client.get_verse_of_the_day(day=90).day == 90:
             raise AssertionError()
 
+    def test_get_verse_of_the_day_cached(self):
+        if self.client.get_verse_of_the_day(day=90) is not self.client.get_verse_of_the_day(day=90):
+            raise AssertionError()
+
     def test_get_verse_of_the_day_bible_version(self):
         self.client.bible_version = 'ASV'
         if not self.client.get_verse_of_the_day().bible_version.abbreviation == 'ASV':
@@ -242,6 +403,22 @@ class APITest(unittest.TestCase):
         if votd.image._url is None or votd.image._url == '':
             raise AssertionError()
 
+    def test_verse_of_the_day_image_assignable(self):
+        votd = youversion.VerseOfTheDay(bible_version=youversion.BibleVersion.KJV(), json={})
+        image = youversion.Image(verse=votd.verse, json={})
+        votd.image = image
+        if votd.image is not image:
+            raise AssertionError()
+
+    def test_context_manager_closes_session(self):
+        api = youversion.API(YOUVERSION_API_TOKEN)
+        with mock.patch.object(api._session, 'close') as close:
+            with api as entered:
+                if entered is not api:
+                    raise AssertionError()
+        if not close.called:
+            raise AssertionError()
+
     def test_get_all_verse_of_the_days(self):
         more_data, size, votds = self.client.get_all_verse_of_the_days()
         if more_data:
@@ -252,3 +429,12 @@ class APITest(unittest.TestCase):
             raise AssertionError()
         if votds is None or len(votds) != size:
             raise AssertionError()
+
+    def test_get_verses_of_the_day(self):
+        votds = self.client.get_verses_of_the_day([3, 1, 2])
+        if not [votd.day for votd in votds] == [3, 1, 2]:
+            raise AssertionError()
+
+    def test_get_verses_of_the_day_invalid_day(self):
+        with pytest.raises(youversion.DayOutOfBounds):
+            self.client.get_verses_of_the_day([1, 367])
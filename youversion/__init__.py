@@ -1,22 +1,60 @@
-# Helpers
-from .youversion import day_of_year
-from .youversion import day_of_year_from_timestamp
-from .youversion import day_of_the_year_from_iso_date
-from .youversion import current_day_of_year
+from importlib import import_module
 
-# Types
-from .youversion import BibleVersionOption
+# Helpers
+from ._core import day_of_year
+from ._core import day_of_year_from_timestamp
+from ._core import day_of_the_year_from_iso_date
+from ._core import current_day_of_year
 
 # Errors
-from .youversion import UnsupportedLanguage
-from .youversion import InvalidImageSize
-from .youversion import InvalidBibleVersion
-from .youversion import DayOutOfBounds
+from ._core import UnsupportedLanguage
+from ._core import InvalidImageSize
+from ._core import InvalidBibleVersion
+from ._core import DayOutOfBounds
 
 # Classes
-from .youversion import Language
-from .youversion import BibleVersion
-from .youversion import Verse
-from .youversion import Image
-from .youversion import VerseOfTheDay
-from .youversion import API
+from ._core import Language
+
+# Names loaded from .youversion on first access so that importing the package
+# does not pull in requests until the API is actually used
+_LAZY = {
+    # Helpers
+    'download_all',
+
+    # Types
+    'BibleVersionOption',
+
+    # Classes
+    'BibleVersion',
+    'Verse',
+    'Image',
+    'VerseOfTheDay',
+    'API',
+}
+
+__all__ = [
+    'day_of_year',
+    'day_of_year_from_timestamp',
+    'day_of_the_year_from_iso_date',
+    'current_day_of_year',
+    'UnsupportedLanguage',
+    'InvalidImageSize',
+    'InvalidBibleVersion',
+    'DayOutOfBounds',
+    'Language',
+    *sorted(_LAZY),
+]
+
+
+def __getattr__(name: str):
+    if name == 'youversion':
+        return import_module('.youversion', __name__)
+    if name in _LAZY:
+        value = getattr(import_module('.youversion', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY)
@@ -0,0 +1,110 @@
+from datetime import date, datetime
+from time import localtime
+
+
+def day_of_year(dt: date) -> int:
+    """
+    Gets the day of the year from a date or datetime as an int
+
+    :param dt: date or datetime to get day of the year from
+    :return: day of the year as an int
+    """
+    return dt.toordinal() - date(dt.year, 1, 1).toordinal() + 1
+
+
+def day_of_year_from_timestamp(t: float) -> int:
+    """
+    Gets the day of the year from a timestamp as an int
+
+    :param t: timestamp as a float
+    :return: day of the year as an int
+    """
+    return localtime(t).tm_yday
+
+
+def day_of_the_year_from_iso_date(date_string: str) -> int:
+    """
+    Gets the day of the year from a ISO date string as returned from output of datetime.isoformat()
+
+    :param date_string: An ISO date string as returned from output of datetime.isoformat()
+    :return: day of the year as an int
+    """
+    # Fast path for plain YYYY-MM-DD dates
+    if len(date_string) == 10 and date_string[4] == '-' and date_string[7] == '-':
+        year, month, day = date_string[0:4], date_string[5:7], date_string[8:10]
+        if date_string.isascii() and (year + month + day).isdigit():
+            return day_of_year(date(int(year), int(month), int(day)))
+
+    return day_of_year(datetime.fromisoformat(date_string))
+
+
+def current_day_of_year() -> int:
+    """
+    Gets the current day fo the year
+
+    :return: day of the year as an int
+    """
+    return day_of_year(date.today())
+
+
+class UnsupportedLanguage(Exception):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args)
+        self.language = kwargs.get('language', '')
+
+
+class InvalidImageSize(Exception):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args)
+        self.size = kwargs.get('size', None)
+
+
+class InvalidBibleVersion(Exception):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args)
+        self.version = kwargs.get('version', None)
+
+
+class DayOutOfBounds(Exception):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args)
+        self.day = kwargs.get('day', None)
+
+
+class Language:
+    """
+    Supported API languages
+    """
+
+    Afrikaans = 'af'
+    Chinese_Simplified = 'zh_CN'
+    Chinese_Traditional = 'zh_TW'
+    Dutch = 'nl'
+    English = 'en'
+    French = 'fr'
+    German = 'de'
+    Greek = 'el'
+    Indonesian = 'id'
+    Italian = 'it'
+    Khmer = 'km'
+    Korean = 'ko'
+    Portuguese = 'pt'
+    Romanian = 'ro'
+    Russian = 'ru'
+    Spanish = 'es'
+    Swahili = 'sw'
+    Swedish = 'sv'
+    Tagalog = 'tl'
+    Filipino = 'tl'
+    Ukrainian = 'uk'
+    Vietnamese = 'vi'
+    Zulu = 'zu'
+
+
+# Language lookups by attribute name and by tag
+_LANG_BY_NAME = {k: v for k, v in vars(Language).items() if not k.startswith('_') and isinstance(v, str)}
+_LANG_CODES = frozenset(_LANG_BY_NAME.values())
@@ -1,49 +1,40 @@
-from typing import Dict, TypeVar, Optional, List, Tuple
-from datetime import datetime
-from os import path, getcwd
-from shutil import copyfileobj
-from posixpath import join as urljoin
+from typing import Dict, TypeVar, Optional, List, Tuple, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import date
+from time import time
+from os import path, getcwd, makedirs
+import json
+import re
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def day_of_year(dt: datetime) -> int:
-    """
-    Gets the day of the year from a datetime as an int
-
-    :param dt: datetime to get day of the year from
-    :return: day of the year as an int
-    """
-    return dt.timetuple().tm_yday
-
-
-def day_of_year_from_timestamp(t: float) -> int:
-    """
-    Gets the day of the year from a timestamp as an int
-
-    :param t: timestamp as a float
-    :return: day of the year as an int
-    """
-    return day_of_year(datetime.fromtimestamp(t))
-
+from ._core import day_of_year
+from ._core import day_of_year_from_timestamp
+from ._core import day_of_the_year_from_iso_date
+from ._core import current_day_of_year
+from ._core import UnsupportedLanguage
+from ._core import InvalidImageSize
+from ._core import InvalidBibleVersion
+from ._core import DayOutOfBounds
+from ._core import Language
+from ._core import _LANG_BY_NAME, _LANG_CODES
 
-def day_of_the_year_from_iso_date(date_string: str) -> int:
-    """
-    Gets the day of the year from a ISO date string as returned from output of datetime.isoformat()
 
-    :param date_string: An ISO date string as returned from output of datetime.isoformat()
-    :return: day of the year as an int
-    """
-    return day_of_year(datetime.fromisoformat(date_string))
+# Matches exactly the characters for which str.isalnum() is False
+_NON_ALNUM = re.compile(r'[\W_]+')
 
-
-def current_day_of_year() -> int:
-    """
-    Gets the current day fo the year
-
-    :return: day of the year as an int
-    """
-    return day_of_year(datetime.now())
+# Deletes every non-alphanumeric ASCII character
+_ASCII_SLUG_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isalnum()))
 
 
 def _slugify(value: str) -> str:
@@ -54,72 +45,19 @@ def _slugify(value: str) -> str:
     :param value: value as a str
     :return: slugified version of the value
     """
-    return ''.join(s for s in value if s.isalnum()).lower()
-
-
-class UnsupportedLanguage(Exception):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args)
-        self.language = kwargs.get('language', '')
-
-
-class InvalidImageSize(Exception):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args)
-        self.size = kwargs.get('size', None)
-
-
-class InvalidBibleVersion(Exception):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args)
-        self.version = kwargs.get('version', None)
-
-
-class DayOutOfBounds(Exception):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args)
-        self.day = kwargs.get('day', None)
-
-class Language:
-    """
-    Supported API languages
-    """
-
-    Afrikaans = 'af'
-    Chinese_Simplified = 'zh_CN'
-    Chinese_Traditional = 'zh_TW'
-    Dutch = 'nl'
-    English = 'en'
-    French = 'fr'
-    German = 'de'
-    Greek = 'el'
-    Indonesian = 'id'
-    Italian = 'it'
-    Khmer = 'km'
-    Korean = 'ko'
-    Portuguese = 'pt'
-    Romanian = 'ro'
-    Russian = 'ru'
-    Spanish = 'es'
-    Swahili = 'sw'
-    Swedish = 'sv'
-    Tagalog = 'tl'
-    Filipino = 'tl'
-    Ukrainian = 'uk'
-    Vietnamese = 'vi'
-    Zulu = 'zu'
+    if value.isascii():
+        return value.translate(_ASCII_SLUG_TABLE).lower()
+    return _NON_ALNUM.sub('', value).lower()
 
 
 class BibleVersion:
     """
     Contains information about a Bible version
     """
+    __slots__ = ('id', 'title', 'abbreviation', 'local_title', 'local_abbreviation', 'copyright')
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def KJV():
         """
         Cached King James BibleVersion
@@ -148,6 +86,7 @@ class Verse:
     """
     Bible Verse
     """
+    __slots__ = ('bible_version', 'reference', 'text', 'html', 'url', 'usfms')
 
     def __init__(self, bible_version: BibleVersion, json: dict):
         """
@@ -168,43 +107,55 @@ class Image:
     """
     Verse Image
     """
-    MAX_SIZE = 1280
+    __slots__ = ('verse', '_session', '_url', '_url_format', 'attribution')
 
-    @staticmethod
-    def _check_size(size: int):
-        """
-        Checks that the provided size is within the allowed bounds
+    MAX_SIZE = 1280
+    CHUNK_SIZE = 1 << 20
 
-        :param size: size to check as an int
-        :return: None if valid otherwise InvalidImageSize is raised
-        """
-        if size > Image.MAX_SIZE:
-            raise InvalidImageSize(size=size)
+    # Images are already compressed so ask for them as-is, and keep the API
+    # headers of a shared session from being sent to the image host
+    _DOWNLOAD_HEADERS = {
+        'accept': None,
+        'accept-language': None,
+        'x-youversion-developer-token': None,
+        'accept-encoding': 'identity',
+    }
 
-    def __init__(self, verse: Verse, json: dict):
+    def __init__(self, verse: Verse, json: dict, session: Optional[requests.Session] = None):
         """
         Constructs an Image
 
         :param verse: Verse associated with the image
         :param json: API response
+        :param session: requests.Session used to download the image. Defaults to a one-off request
         """
         self.verse = verse
+        self._session = session
         self._url = f'https:{json.get("url", "")}'
+        # Escape any other braces so the {width}/{height} placeholders can be filled in a single pass
+        self._url_format = (
+            self._url.replace('{', '{{').replace('}', '}}')
+                .replace('{{width}}', '{width}')
+                .replace('{{height}}', '{height}')
+        )
         self.attribution = json.get('attribution', '')
 
     def url(self, width: int = MAX_SIZE, height: int = MAX_SIZE) -> str:
         """
         Gets an image url for the given width and height. InvalidImageSize raised If either the width or height
-        is beyond the MAX_SIZE.
+        is not between 1 and MAX_SIZE.
 
         :param width: width of the image. Defaults to MAX_SIZE
         :param height: height of the image. Defaults to MAX_SIZE
         :return: url as str
         """
-        Image._check_size(width)
-        Image._check_size(height)
+        max_size = Image.MAX_SIZE
+        if not 0 < width <= max_size:
+            raise InvalidImageSize(size=width)
+        if not 0 < height <= max_size:
+            raise InvalidImageSize(size=height)
 
-        return self._url.replace('{width}', str(width)).replace('{height}', str(height))
+        return self._url_format.format(width=width, height=height)
 
     def square_url(self, size: int = MAX_SIZE) -> str:
         """
@@ -212,25 +163,41 @@ class Image:
         :param size: size of the image as an int. Defaults to MAX_SIZE
         :return: url as a str
         """
-        return self.url(size, size)
+        if not 0 < size <= Image.MAX_SIZE:
+            raise InvalidImageSize(size=size)
+
+        return self._url_format.format(width=size, height=size)
+
+    def _default_save_path(self, save_dir: str = None, prefix: str = '') -> str:
+        """
+        Gets the default path an image is downloaded to, named after the slugified verse reference
 
-    def download(self, width: int = MAX_SIZE, height: int = MAX_SIZE, save_path: str = None) -> str:
+        :param save_dir: directory of the image. Defaults to the current directory
+        :param prefix: str prepended to the file name
+        :return: image path as str
+        """
+        return path.join(save_dir if save_dir else getcwd(), f'{prefix}{_slugify(self.verse.reference)}.jpg')
+
+    def download(self, width: int = MAX_SIZE, height: int = MAX_SIZE, save_path: str = None,
+                 chunk_size: int = CHUNK_SIZE) -> str:
         """
         Downloads the current image into the save_path
 
         :param width: image width as an int. Defaults to MAX_SIZE
         :param height: image height as an int. Defaults to MAX_SIZE
         :param save_path: full path to downloaded file including file name. Defaults the current directory
+        :param chunk_size: number of bytes read and written at a time. Defaults to CHUNK_SIZE
         :return: image path as str
         """
         image_url = self.url(width, height)
-        image_path = save_path if save_path else path.join(getcwd(), f'{_slugify(self.verse.reference)}.jpg')
+        image_path = save_path if save_path else self._default_save_path()
 
-        with requests.get(image_url, stream=True) as response:
+        http = self._session if self._session else requests
+        with http.get(image_url, headers=Image._DOWNLOAD_HEADERS, stream=True) as response:
             response.raise_for_status()
             with open(image_path, 'wb') as file:
-                response.raw.decode_content = True
-                copyfileobj(response.raw, file)
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    file.write(chunk)
 
         return image_path
 
@@ -239,26 +206,60 @@ class VerseOfTheDay:
     """
     Verse of the Day
     """
+    __slots__ = ('bible_version', 'day', 'verse', '_image', '_image_json', '_session')
 
-    def __init__(self, bible_version: BibleVersion, json: dict):
+    def __init__(self, bible_version: BibleVersion, json: dict, session: Optional[requests.Session] = None):
         """
         Constructs a Verse of the Day
 
         :param bible_version: BibleVersion associated with the verse
         :param json: API response
+        :param session: requests.Session passed along to the Image for downloads
         """
         self.bible_version = bible_version
         self.day = json.get('day', None)
         self.verse = Verse(bible_version=self.bible_version, json=json.get('verse', {}))
-        self.image = Image(verse=self.verse, json=json.get('image', {}))
+        self._image = None
+        self._image_json = json.get('image', {})
+        self._session = session
+
+    @property
+    def image(self) -> Image:
+        """
+        Gets the verse image, constructed on first access
+
+        :return: Image for the verse
+        """
+        if self._image is None:
+            self._image = Image(verse=self.verse, json=self._image_json, session=self._session)
+        return self._image
+
+    @image.setter
+    def image(self, image: Image):
+        """
+        Sets the verse image
+
+        :param image: Image for the verse
+        """
+        self._image = image
 
 
 BibleVersionOption = TypeVar('BibleVersionOption', str, BibleVersion)
 
+# Bible versions by language, shared between API instances
+_VERSIONS_CACHE: Dict[str, Tuple[float, Dict[str, BibleVersion]]] = {}
+
 
 class API:
     VERSION = '1.0'
     BASE_URL = f'https://developers.youversionapi.com/{VERSION}'
+    _BASE = BASE_URL.rstrip('/') + '/'
+    MAX_WORKERS = 16
+    MAX_RETRIES = 5
+    VALIDATOR_CACHE_SIZE = 8
+    _REVALIDATED_RESOURCES = frozenset(('versions', 'verse_of_the_day'))
+    CACHE_DIR = path.join(path.expanduser('~'), '.cache', 'youversion')
+    VERSIONS_CACHE_TTL = 24 * 60 * 60
 
     def __init__(self, token: str, language: str = Language.English):
         """
@@ -270,9 +271,34 @@ class API:
         """
 
         self._token = token
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_maxsize=API.MAX_WORKERS,
+            max_retries=Retry(
+                total=API.MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            ),
+        ))
         self.language = language
         self.bible_version = BibleVersion.KJV()
         self._supported_bible_version = {}
+        self._votd_cache: Dict[Tuple[int, int, str], Tuple[date, VerseOfTheDay]] = {}
+        self._validator_cache: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str], dict]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes the underlying requests.Session and any pooled connections
+        """
+        self._session.close()
 
     @property
     def language(self):
@@ -292,13 +318,20 @@ class API:
 
         :param language: one of the supported Language tags
         """
-        if language in Language.__dict__:
-            self.__language = Language.__dict__.get(language)
-        elif language in Language.__dict__.values():
+        if language in _LANG_BY_NAME:
+            self.__language = _LANG_BY_NAME[language]
+        elif language in _LANG_CODES:
             self.__language = language
         else:
             raise UnsupportedLanguage(language=language)
 
+        self.__header = {
+            "accept": "application/json",
+            "x-youversion-developer-token": self._token,
+            "accept-language": self.__language,
+        }
+        self._session.headers.update(self.__header)
+
     @property
     def bible_version(self) -> Optional[BibleVersion]:
         """
@@ -316,18 +349,24 @@ class API:
         """
         if isinstance(bible_version, BibleVersion):
             self.__bible_version = bible_version
-        elif isinstance(bible_version, str) and self.supports_bible_version(bible_version):
-            self.__bible_version = self.get_bible_version(bible_version)
-        else:
-            raise InvalidBibleVersion(version=bible_version)
+            return
+
+        if isinstance(bible_version, str):
+            version = self.bible_versions.get(bible_version)
+            if version is not None:
+                self.__bible_version = version
+                return
+
+        raise InvalidBibleVersion(version=bible_version)
 
     @property
     def _header(self) -> Dict[str, str]:
-        return {
-            "accept": "application/json",
-            "x-youversion-developer-token": self._token,
-            "accept-language": self.language,
-        }
+        """
+        Gets the request headers, rebuilt only when the language changes
+
+        :return: Dict of header name to value
+        """
+        return self.__header
 
     def _get(self, resource: str, *args, **kwargs):
         """
@@ -339,11 +378,41 @@ class API:
         :return: json response
         """
 
-        url = urljoin(API.BASE_URL, resource)
-        response = requests.get(url, headers=self._header, **kwargs)
+        url = API._BASE + resource.lstrip('/')
+        headers = CaseInsensitiveDict(kwargs.pop('headers', None))
+
+        # Revalidate the versions list and bulk verse of the day responses so unchanged resources
+        # come back as an empty 304. Per day responses are already cached by get_verse_of_the_day
+        key = None
+        cached = None
+        if resource.strip('/') in API._REVALIDATED_RESOURCES:
+            request = PreparedRequest()
+            request.prepare_url(url, kwargs.get('params'))
+            key = (request.url, self.language)
+            cached = self._validator_cache.get(key)
+
+        if cached:
+            etag, last_modified, _ = cached
+            headers.setdefault('if-none-match', etag)
+            headers.setdefault('if-modified-since', last_modified)
+
+        response = self._session.get(url, headers=headers, **kwargs)
+
+        if cached and response.status_code == 304:
+            return cached[2]
 
         if response.ok:
-            return response.json()
+            json = orjson.loads(response.content) if orjson else response.json()
+
+            etag = response.headers.get('etag')
+            last_modified = response.headers.get('last-modified')
+            if key and (etag or last_modified):
+                self._validator_cache.pop(key, None)
+                while len(self._validator_cache) >= API.VALIDATOR_CACHE_SIZE:
+                    del self._validator_cache[next(iter(self._validator_cache))]
+                self._validator_cache[key] = (etag, last_modified, json)
+
+            return json
 
         response.raise_for_status()
 
@@ -354,15 +423,55 @@ class API:
 
         :return: Dict mapping abbreviation to BibleVersion
         """
-        if len(self._supported_bible_version) <= 0:
-            versions = self._get('versions')
-            for data in versions.get('data'):
-                bible_version = BibleVersion(data)
-                if bible_version.abbreviation not in self._supported_bible_version:
-                    self._supported_bible_version.setdefault(bible_version.abbreviation, bible_version)
-
+        cached = _VERSIONS_CACHE.get(self.language)
+        if cached and time() - cached[0] < API.VERSIONS_CACHE_TTL:
+            versions = cached[1]
+        else:
+            loaded_at, data = self._load_bible_versions()
+            versions = {}
+            for item in data:
+                abbreviation = item.get('abbreviation')
+                if abbreviation and abbreviation not in versions:
+                    versions[abbreviation] = BibleVersion(item)
+            _VERSIONS_CACHE[self.language] = (loaded_at, versions)
+
+        self._supported_bible_version = versions
         return self._supported_bible_version
 
+    def _load_bible_versions(self) -> Tuple[float, List[dict]]:
+        """
+        Loads the raw Bible version data for the current language. The on-disk cache in
+        CACHE_DIR is used while it is younger than VERSIONS_CACHE_TTL seconds, otherwise the
+        versions are fetched from the API and the cache is refreshed.
+
+        Setting CACHE_DIR to None disables the on-disk cache.
+
+        :return: tuple of the time the data was fetched and the list of Bible version json objects
+        """
+        cache_path = path.join(API.CACHE_DIR, f'versions-{self.language}.json') if API.CACHE_DIR else None
+
+        if cache_path:
+            try:
+                modified_at = path.getmtime(cache_path)
+                if time() - modified_at < API.VERSIONS_CACHE_TTL:
+                    with open(cache_path, encoding='utf-8') as file:
+                        return modified_at, json.load(file)
+            except (OSError, ValueError):
+                pass
+
+        fetched_at = time()
+        versions = self._get('versions').get('data', [])
+
+        if cache_path:
+            try:
+                makedirs(API.CACHE_DIR, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as file:
+                    json.dump(versions, file)
+            except OSError:
+                pass
+
+        return fetched_at, versions
+
     def supports_bible_version(self, abbreviation: str) -> bool:
         """
         Checks to see if the given abbreviation is supported by the YouVersion API
@@ -370,11 +479,7 @@ class API:
         :param abbreviation: Bible version abbreviation
         :return: True is the abbreviation is supported otherwise False
         """
-        try:
-            self.get_bible_version(abbreviation)
-            return True
-        except InvalidBibleVersion:
-            return False
+        return abbreviation in self.bible_versions
 
     def get_bible_version(self, abbreviation: str) -> BibleVersion:
         """
@@ -384,30 +489,61 @@ class API:
         :param abbreviation: Bible version abbreviation
         :return: BibleVersion
         """
-        if abbreviation in self.bible_versions:
-            return self._supported_bible_version[abbreviation]
-        raise InvalidBibleVersion(version=abbreviation)
+        bible_version = self.bible_versions.get(abbreviation)
+        if bible_version is None:
+            raise InvalidBibleVersion(version=abbreviation)
+        return bible_version
 
-    def get_verse_of_the_day(self, day: int = current_day_of_year()) -> VerseOfTheDay:
+    def get_verse_of_the_day(self, day: Optional[int] = None) -> VerseOfTheDay:
         """
-        Gets the verse of the day for the given day
+        Gets the verse of the day for the given day. Responses are cached for the rest of
+        the current date per day, Bible version and language.
 
         :param day: day as an int defaults to the current day of the year
         :return: VerseOfTheDay for the given day
         """
+        if day is None:
+            day = current_day_of_year()
 
         if day < 1 or day > 366:
             raise DayOutOfBounds(day=day)
 
-        return VerseOfTheDay(
-            bible_version=self.bible_version,
+        bible_version = self.bible_version
+        today = date.today()
+        key = (day, bible_version.id, self.language)
+        cached = self._votd_cache.get(key)
+        if cached and cached[0] == today:
+            return cached[1]
+
+        votd = VerseOfTheDay(
+            bible_version=bible_version,
             json=self._get(
                 f'verse_of_the_day/{day}',
                 params={
-                    'version_id': self.bible_version.id
+                    'version_id': bible_version.id
                 }
-            )
+            ),
+            session=self._session
         )
+        self._votd_cache[key] = (today, votd)
+
+        return votd
+
+    def get_verses_of_the_day(self, days: Iterable[int], max_workers: int = MAX_WORKERS) -> List[VerseOfTheDay]:
+        """
+        Gets the verse of the day for each of the given days, fetching them concurrently
+
+        :param days: days of the year as ints
+        :param max_workers: maximum number of concurrent requests. Defaults to MAX_WORKERS
+        :return: list of VerseOfTheDay in the same order as days
+        """
+        days = list(days)
+        for day in days:
+            if day < 1 or day > 366:
+                raise DayOutOfBounds(day=day)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.get_verse_of_the_day, days))
 
     def get_all_verse_of_the_days(self, limit: int = 366, page: int = 1) -> Tuple[bool, int, Optional[List[VerseOfTheDay]]]:
         """
@@ -420,9 +556,44 @@ class API:
             int the number of VerseOfTheDay objects contained in the response
             list of VerseOfTheDay objects
         """
-        json = self._get('verse_of_the_day', params={'version_id': self.bible_version.id})
-        votds = [VerseOfTheDay(bible_version=self.bible_version, json=data) for data in json.get('data', [])]
+        bible_version = self.bible_version
+        session = self._session
+        json = self._get('verse_of_the_day', params={'version_id': bible_version.id})
+        votds = [
+            VerseOfTheDay(bible_version=bible_version, json=data, session=session)
+            for data in json.get('data', [])
+        ]
         next_page = json.get('next_page', False)
         page_size = json.get('page_size', len(votds))
 
         return next_page, page_size, votds
+
+
+def download_all(votds: Iterable[VerseOfTheDay], width: int = Image.MAX_SIZE, height: int = Image.MAX_SIZE,
+                 save_dir: str = None, max_workers: int = API.MAX_WORKERS) -> List[str]:
+    """
+    Downloads the images of the given verse of the days concurrently
+
+    :param votds: VerseOfTheDay objects whose images should be downloaded
+    :param width: image width as an int. Defaults to Image.MAX_SIZE
+    :param height: image height as an int. Defaults to Image.MAX_SIZE
+    :param save_dir: directory to save the images into. Defaults the current directory
+    :param max_workers: maximum number of concurrent downloads. Defaults to API.MAX_WORKERS
+    :return: list of image paths as str in the same order as votds. Images are named
+        <day>-<version>-<reference>.jpg, so repeated entries share one downloaded file
+    """
+    def save_path(votd: VerseOfTheDay) -> str:
+        abbreviation = votd.bible_version.abbreviation if votd.bible_version else ''
+        return votd.image._default_save_path(save_dir, prefix=f'{votd.day}-{_slugify(abbreviation)}-')
+
+    def download(target: Tuple[str, VerseOfTheDay]) -> str:
+        image_path, votd = target
+        return votd.image.download(width=width, height=height, save_path=image_path)
+
+    targets = [(save_path(votd), votd) for votd in votds]
+
+    # Download each distinct file once so that no two workers write to the same path
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(download, dict(targets).items()))
+
+    return [image_path for image_path, _ in targets]